@@ -8,20 +8,21 @@ from homeassistant.helpers import device_registry as dr
 
 from .api import Api
 from .const import CONF_MQTTLOG, CONF_P1METER, CONF_SIM
-from .device import ZendureDevice
 from .manager import ZendureConfigEntry, ZendureManager
 from .migration import Migration
 
-PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR, Platform.BUTTON, Platform.NUMBER, Platform.SELECT, Platform.SENSOR, Platform.SWITCH]
+PLATFORMS: tuple[Platform, ...] = (Platform.BINARY_SENSOR, Platform.BUTTON, Platform.NUMBER, Platform.SELECT, Platform.SENSOR, Platform.SWITCH)
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_migrate_entry(hass: HomeAssistant, entry: ZendureConfigEntry) -> bool:
     """Migrate config entry to new version."""
-    if entry.version == 1 and entry.minor_version < 5:
-        _LOGGER.info("Migrating Zendure config entry from version %s.%s", entry.version, entry.minor_version)
-        await Migration.async_migrate(hass, entry.entry_id)
+    if entry.version != 1 or entry.minor_version >= 5:
+        return True
+
+    _LOGGER.info("Migrating Zendure config entry from version %s.%s", entry.version, entry.minor_version)
+    await Migration.async_migrate(hass, entry.entry_id)
     hass.config_entries.async_update_entry(entry, version=1, minor_version=5)
     return True
 
@@ -51,17 +52,16 @@ async def async_unload_entry(hass: HomeAssistant, entry: ZendureConfigEntry) ->
     result = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if result:
         manager = entry.runtime_data
-        if Api.mqttCloud.is_connected():
-            Api.mqttCloud.disconnect()
-        if Api.mqttLocal.is_connected():
-            Api.mqttLocal.disconnect()
+        Api.mqttStop(Api.mqttCloud)
+        Api.mqttStop(Api.mqttLocal)
         for c in Api.devices.values():
-            if c.zendure is not None and c.zendure.is_connected():
-                c.zendure.disconnect()
+            Api.mqttStop(c.zendure)
             c.zendure = None
         manager.update_p1meter(None)
         manager.fuseGroups.clear()
         manager.devices.clear()
+        Api.devices.clear()
+        Api.deviceNames.clear()
     return result
 
 
@@ -70,13 +70,14 @@ async def async_remove_config_entry_device(_hass: HomeAssistant, entry: ZendureC
     manager = entry.runtime_data
 
     # check for device to remove
-    for d in manager.devices:
-        if d.name == device_entry.name:
-            manager.devices.remove(d)
-            return True
-
-        if isinstance(d, ZendureDevice) and (bat := next((b for b in d.batteries.values() if b.name == device_entry.name), None)) is not None:
-            d.batteries.pop(bat.deviceId)
-            return True
+    if (owner := Api.deviceNames.pop(device_entry.name, None)) is None:
+        return True
+
+    deviceId, sn = owner
+    if sn is None:
+        if (device := Api.devices.get(deviceId)) is not None and device in manager.devices:
+            manager.devices.remove(device)
+    elif (device := Api.devices.get(deviceId)) is not None and (bat := device.batteries.pop(sn, None)) is not None:
+        device.batteryCapacity(-bat.kWh)
 
     return True
@@ -2,16 +2,17 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
-import json
 import logging
 import secrets
-import traceback
+import threading
+import time
 from base64 import b64decode
 from collections.abc import Callable
-from datetime import datetime
 from typing import Any, Mapping
 
+import orjson
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ServiceValidationError
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
@@ -48,6 +49,111 @@ _LOGGER = logging.getLogger(__name__)
 
 ZENDURE_MANAGER_STORAGE_VERSION = 1
 ZENDURE_DEVICES = "devices"
+CONST_SIGNKEY = CONF_HAKEY.encode()
+
+
+def topicSplit(topic: str) -> tuple[str, str, str]:
+    """Split prefix/prodkey/deviceId/topic into prefix, deviceId and topic, slicing only the parts that are used."""
+    i1 = topic.find("/")
+    i2 = topic.find("/", i1 + 1)
+    i3 = topic.find("/", i2 + 1)
+    if i2 < 0 or i3 < 0:
+        return topic, "", ""
+    return topic[:i1], topic[i2 + 1 : i3], topic[i3 + 1 :]
+
+
+class MqttLoop:
+    """Run a paho client on the Home Assistant event loop instead of a paho network thread."""
+
+    def __init__(self, hass: HomeAssistant, client: mqtt_client.Client, srv: str, port: int) -> None:
+        """Attach the client sockets to the event loop and start connecting."""
+        self.hass = hass
+        self.client = client
+        self.stopped = False
+        # reconnect backoff, only reset by a successful CONNACK
+        self.delay = 1
+        self.retry = 0.0
+        self.logged = False
+        client.on_socket_open = self.on_socket_open
+        client.on_socket_close = self.on_socket_close
+        client.on_socket_register_write = self.on_socket_register_write
+        client.on_socket_unregister_write = self.on_socket_unregister_write
+        # only store the connection parameters, the network connect is done by run()
+        client.connect_async(srv, port)
+        self.task = hass.async_create_background_task(self.run(), f"zendure_ha mqtt {srv}")
+
+    def call(self, func: Callable[..., Any], *args: Any) -> None:
+        """Call func on the event loop, the connect itself runs in the executor."""
+        if threading.get_ident() == self.hass.loop_thread_id:
+            func(*args)
+        else:
+            self.hass.loop.call_soon_threadsafe(func, *args)
+
+    def on_socket_open(self, _client: mqtt_client.Client, _userdata: Any, sock: Any) -> None:
+        self.call(self.socketOpen, sock)
+
+    def on_socket_close(self, _client: mqtt_client.Client, _userdata: Any, sock: Any) -> None:
+        self.call(self.socketClose, sock)
+
+    def on_socket_register_write(self, _client: mqtt_client.Client, _userdata: Any, sock: Any) -> None:
+        self.call(self.socketWrite, sock)
+
+    def on_socket_unregister_write(self, _client: mqtt_client.Client, _userdata: Any, sock: Any) -> None:
+        self.call(self.hass.loop.remove_writer, sock)
+
+    def socketOpen(self, sock: Any) -> None:
+        if self.stopped:
+            # a connect that finished after stop is closed instead of being kept alive
+            self.disconnect()
+        elif self.client.socket() is sock:
+            self.hass.loop.add_reader(sock, self.client.loop_read)
+
+    def socketClose(self, sock: Any) -> None:
+        self.hass.loop.remove_reader(sock)
+        self.hass.loop.remove_writer(sock)
+
+    def socketWrite(self, sock: Any) -> None:
+        # the socket may already be closed when this runs
+        if self.client.socket() is sock:
+            self.hass.loop.add_writer(sock, self.client.loop_write)
+
+    def connected(self, reason_code: Any) -> None:
+        """Reset the reconnect backoff once the broker accepted the connection."""
+        if not reason_code.is_failure:
+            self.delay = 1
+            self.logged = False
+
+    async def run(self) -> None:
+        """Keep the client connected and handle the keepalive."""
+        while not self.stopped:
+            if self.client.socket() is None:
+                if (now := time.monotonic()) >= self.retry:
+                    self.retry = now + self.delay
+                    self.delay = min(self.delay * 2, 120)
+                    try:
+                        await self.hass.async_add_executor_job(self.client.reconnect)
+                    except Exception as e:
+                        # only the first failure after a connection is an error
+                        if self.logged:
+                            _LOGGER.debug("Unable to connect to %s:%s %s, retry in %ss", self.client.host, self.client.port, e, self.delay)
+                        else:
+                            _LOGGER.error("Unable to connect to %s:%s %s!", self.client.host, self.client.port, e)
+                            self.logged = True
+            else:
+                self.client.loop_misc()
+            await asyncio.sleep(1)
+
+    def disconnect(self) -> None:
+        """Send the DISCONNECT now, paho closes the socket once it is written."""
+        if self.client.socket() is not None:
+            self.client.disconnect()
+            self.client.loop_write()
+
+    def stop(self) -> None:
+        """Stop reconnecting and disconnect the client."""
+        self.stopped = True
+        self.task.cancel()
+        self.disconnect()
 
 
 class Api:
@@ -79,21 +185,26 @@ class Api:
     mqttLocal = mqtt_client.Client(userdata="local")
     mqttLogging: bool = False
     devices: dict[str, ZendureDevice] = {}
+    mqttLoops: dict[mqtt_client.Client, MqttLoop] = {}
+    deviceNames: dict[str, tuple[str, str | None]] = {}
+    appTokens: dict[str, tuple[str, str]] = {}
     cloudServer: str = ""
-    cloudPort: str = ""
+    cloudPort: int = 1883
     localServer: str = ""
-    localPort: str = ""
+    localPort: int = 1883
     localUser: str = ""
     localPassword: str = ""
     wifipsw: str = ""
     wifissid: str = ""
 
-    def Init(self, data: Mapping[str, Any], mqtt: Mapping[str, Any]) -> None:
+    def Init(self, hass: HomeAssistant, data: Mapping[str, Any], mqtt: Mapping[str, Any]) -> None:
         """Initialize Zendure Api."""
+        self.hass = hass
         Api.mqttLogging = data.get(CONF_MQTTLOG, False)
         Api.mqttCloud.__init__(mqtt_enums.CallbackAPIVersion.VERSION2, mqtt["clientId"], False, "cloud", mqtt_enums.MQTTProtocolVersion.MQTTv31)
         url = mqtt["url"]
-        Api.cloudServer, Api.cloudPort = url.rsplit(":", 1) if ":" in url else (url, "1883")
+        Api.cloudServer, port = url.rsplit(":", 1) if ":" in url else (url, "1883")
+        Api.cloudPort = int(port)
         self.mqttInit(Api.mqttCloud, Api.cloudServer, Api.cloudPort, mqtt["username"], mqtt["password"])
 
         # Get wifi settings
@@ -102,7 +213,7 @@ class Api:
 
         # Get local Mqtt settings
         Api.localServer = data.get(CONF_MQTTSERVER, "")
-        Api.localPort = data.get(CONF_MQTTPORT, 1883)
+        Api.localPort = int(data.get(CONF_MQTTPORT, 1883))
         Api.localUser = data.get(CONF_MQTTUSER, "")
         Api.localPassword = data.get(CONF_MQTTPSW, "")
         if Api.localServer != "":
@@ -132,13 +243,23 @@ class Api:
 
         return devices
 
+    @staticmethod
+    def sign(params: dict[str, Any]) -> str:
+        """Return the request signature for the parameters, sorted by key in ascending order."""
+        sign_bytes = b"".join([CONST_SIGNKEY, *(f"{k}{v}".encode() for k, v in sorted(params.items())), CONST_SIGNKEY])
+        return hashlib.sha1(sign_bytes, usedforsecurity=False).hexdigest().upper()
+
     @staticmethod
     async def ApiHA(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any] | None:
         session = async_get_clientsession(hass)
 
         if (token := data.get(CONF_APPTOKEN)) is not None and len(token) > 1:
-            base64_url = b64decode(str(token)).decode("utf-8")
-            api_url, appKey = base64_url.rsplit(".", 1)
+            if (appToken := Api.appTokens.get(token)) is None:
+                base64_url = b64decode(str(token)).decode("utf-8")
+                api_url, appKey = base64_url.rsplit(".", 1)
+                Api.appTokens[token] = (api_url, appKey)
+            else:
+                api_url, appKey = appToken
         else:
             raise ServiceValidationError(translation_domain=DOMAIN, translation_key="no_zendure_token")
 
@@ -148,24 +269,16 @@ class Api:
             }
 
             # Prepare signature parameters
-            timestamp = int(datetime.now().timestamp())
+            timestamp = int(time.time())
             nonce = str(secrets.randbelow(90000) + 10000)
 
-            # Merge all parameters to be signed and sort by key in ascending order
+            # Merge all parameters to be signed and calculate the signature
             sign_params = {
                 **body,
                 "timestamp": timestamp,
                 "nonce": nonce,
             }
-
-            # Construct signature string
-            body_str = "".join(f"{k}{v}" for k, v in sorted(sign_params.items()))
-
-            # Calculate signature
-            sign_str = f"{CONF_HAKEY}{body_str}{CONF_HAKEY}"
-            sha1 = hashlib.sha1()  # noqa: S324
-            sha1.update(sign_str.encode("utf-8"))
-            sign = sha1.hexdigest().upper()
+            sign = Api.sign(sign_params)
 
             # Build request headers
             headers = {
@@ -177,7 +290,7 @@ class Api:
             }
 
             result = await session.post(url=f"{api_url}/api/ha/deviceList", json=body, headers=headers)
-            data = await result.json()
+            data = await result.json(loads=orjson.loads)
             if data.get("code") != 200:
                 _LOGGER.debug("Zendure API response: %s Message: %s", data.get("code"), data.get("msg"))
             elif data.get("code") == 200 and len(data["data"]["deviceList"]) == 0:
@@ -191,35 +304,48 @@ class Api:
                 return None
             return dict(result)
 
-        except Exception as e:
-            _LOGGER.error("Unable to connect to Zendure %s!", e)
-            _LOGGER.error(traceback.format_exc())
+        except Exception:
+            _LOGGER.exception("Unable to connect to Zendure!")
             return None
 
-    def mqttInit(self, client: mqtt_client.Client, srv: str, port: str, user: str, psw: str) -> None:
+    def mqttInit(self, client: mqtt_client.Client, srv: str, port: int, user: str, psw: str) -> None:
         try:
             client.on_connect = self.mqttConnect
             client.on_disconnect = self.mqttDisconnect
             client.on_message = self.mqttMsgCloud if client == self.mqttCloud else self.mqttMsgLocal if client == self.mqttLocal else self.mqttMsgDevice
             client.suppress_exceptions = True
             client.username_pw_set(user, psw)
-            client.connect(srv, int(port))
-            client.loop_start()
+            Api.mqttLoops[client] = MqttLoop(self.hass, client, srv, port)
         except Exception as e:
             _LOGGER.error("Unable to connect to Zendure %s!", e)
 
+    @staticmethod
+    def mqttStop(client: mqtt_client.Client | None) -> None:
+        """Disconnect a client and stop its event loop handling."""
+        if client is None:
+            return
+        if (loop := Api.mqttLoops.pop(client, None)) is not None:
+            loop.stop()
+        elif client.is_connected():
+            client.disconnect()
+
     def mqttConnect(self, client: Any, userdata: Any, _flags: Any, rc: Any, _props: Any) -> None:
         _LOGGER.info("Client %s connected to MQTT broker, return code: %s", userdata, rc)
+        if (loop := Api.mqttLoops.get(client)) is not None:
+            loop.connected(rc)
         if userdata == "zendure":
             for device in self.devices.values():
                 if client == device.zendure:
-                    client.subscribe(f"iot/{device.prodkey}/{device.deviceId}/#")
-                    Api.mqttCloud.unsubscribe(f"/{device.prodkey}/{device.deviceId}/#")
-                    Api.mqttCloud.unsubscribe(f"iot/{device.prodkey}/{device.deviceId}/#")
-        else:
-            for device in self.devices.values():
-                client.subscribe(f"/{device.prodkey}/{device.deviceId}/#")
-                client.subscribe(f"iot/{device.prodkey}/{device.deviceId}/#")
+                    client.subscribe(device.topic_iot)
+                    Api.mqttCloud.unsubscribe(device.topicUnsubscribe)
+        elif self.devices:
+            # subscribe all devices with a single SUBSCRIBE packet, mqttLogging also needs the unhandled topics
+            if Api.mqttLogging:
+                client.subscribe([(topic, 0) for device in self.devices.values() for topic in device.topicWildcards])
+            else:
+                # drop the wildcards a persistent session may still hold
+                client.unsubscribe([topic for device in self.devices.values() for topic in device.topicWildcards])
+                client.subscribe([(topic, 0) for device in self.devices.values() for topic in device.topicFilters])
 
     def mqttDisconnect(self, _client: Any, userdata: Any, _flags: Any, rc: Any, _props: Any) -> None:
         _LOGGER.info("Client %s disconnected to MQTT broker, return code: %s", userdata, rc)
@@ -228,32 +354,43 @@ class Api:
         if msg.payload is None or not msg.payload:
             return
         try:
-            topics = msg.topic.split("/", 3)
+            _prefix, deviceId, topic = topicSplit(msg.topic)
+            mqttLogging = Api.mqttLogging
 
-            # Validate topic format before accessing indices
-            if len(topics) < 4:
+            # Validate topic format
+            if not topic:
                 _LOGGER.warning("Invalid MQTT topic format: %s (expected 4 segments)", msg.topic)
                 return
 
-            deviceId = topics[2]
+            if (device := Api.devices.get(deviceId)) is not None:
+                # skip topics the device does not handle before decoding
+                if topic not in device.topicHandlers and not mqttLogging:
+                    return
+
+                # a repeated report only refreshes the online state
+                isReport = topic == "properties/report"
+                if isReport and msg.payload == device.lastReport and device.mqtt == client:
+                    device.mqttSeen()
+                    return
 
-            if (device := self.devices.get(deviceId, None)) is not None:
                 try:
-                    payload = json.loads(msg.payload.decode())
-                except json.JSONDecodeError as err:
+                    payload = orjson.loads(msg.payload)
+                except orjson.JSONDecodeError as err:
                     _LOGGER.error("Failed to decode JSON from device %s: %s", deviceId, err)
                     return
-                except UnicodeDecodeError as err:
-                    _LOGGER.error("Failed to decode payload encoding from device %s: %s", deviceId, err)
-                    return
 
+                # skip messages forwarded by HA, only a top-level isHA key marks them
                 if "isHA" in payload:
                     return
 
-                if self.mqttLogging:
+                # only remember reports that decoded, so a retransmission of a bad one is not skipped
+                if isReport:
+                    device.lastReport = msg.payload
+
+                if mqttLogging:
                     _LOGGER.info("Topic: %s => %s", msg.topic.replace(device.deviceId, device.name).replace(device.snNumber, "snxxx"), payload)
 
-                if device.mqttMessage(topics[3], payload) and device.mqtt != client:
+                if device.mqttMessage(topic, payload) and device.mqtt != client:
                     device.mqtt = client
                     device.setStatus()
 
@@ -264,44 +401,45 @@ class Api:
         if msg.payload is None or not msg.payload or len(self.devices) == 0:
             return
         try:
-            topics = msg.topic.split("/", 3)
+            _prefix, deviceId, topic = topicSplit(msg.topic)
+            mqttLogging = Api.mqttLogging
 
-            # Validate topic format before accessing indices
-            if len(topics) < 4:
+            # Validate topic format
+            if not topic:
                 _LOGGER.warning("Invalid local MQTT topic format: %s (expected 4 segments)", msg.topic)
                 return
 
-            deviceId = topics[2]
+            if (device := Api.devices.get(deviceId)) is not None:
+                # skip topics the device does not handle before decoding
+                if topic not in device.topicHandlers and not mqttLogging:
+                    return
 
-            if (device := self.devices.get(deviceId, None)) is not None:
                 try:
-                    payload = json.loads(msg.payload.decode())
-                except json.JSONDecodeError as err:
+                    payload = orjson.loads(msg.payload)
+                except orjson.JSONDecodeError as err:
                     _LOGGER.error("Failed to decode JSON from local device %s: %s", deviceId, err)
                     return
-                except UnicodeDecodeError as err:
-                    _LOGGER.error("Failed to decode local payload encoding from device %s: %s", deviceId, err)
-                    return
 
+                # skip messages forwarded by HA, only a top-level isHA key marks them
                 if "isHA" in payload:
                     return
 
-                if self.mqttLogging:
+                if mqttLogging:
                     _LOGGER.info("Local topic: %s => %s", msg.topic.replace(device.deviceId, device.name).replace(device.snNumber, "snxxx"), payload)
 
-                if device.mqttMessage(topics[3], payload):
+                if device.mqttMessage(topic, payload):
                     if device.mqtt != client:
                         device.mqtt = client
                         device.setStatus()
 
                     if device.zendure is None:
-                        psw = hashlib.md5(device.deviceId.encode()).hexdigest().upper()[8:24]  # noqa: S324
+                        psw = hashlib.md5(device.deviceId.encode(), usedforsecurity=False).hexdigest().upper()[8:24]
                         device.zendure = mqtt_client.Client(mqtt_enums.CallbackAPIVersion.VERSION2, device.deviceId, False, "zendure")
                         self.mqttInit(device.zendure, Api.cloudServer, Api.cloudPort, device.deviceId, psw)
 
                     if device.zendure is not None and device.zendure.is_connected():
                         payload["isHA"] = True
-                        device.zendure.publish(msg.topic, json.dumps(payload, default=lambda o: o.__dict__))
+                        device.zendure.publish(msg.topic, orjson.dumps(payload))
             else:
                 _LOGGER.debug("Local message from unknown device %s: %s", msg.topic, deviceId)
 
@@ -312,10 +450,9 @@ class Api:
         if msg.payload is None or not msg.payload:
             return
         try:
-            topics = msg.topic.split("/", 3)
-            deviceId = topics[2]
+            prefix, deviceId, _topic = topicSplit(msg.topic)
 
-            if self.devices.get(deviceId, None) is not None and topics[0] == "iot":
+            if prefix == "iot" and self.devices.get(deviceId, None) is not None:
                 self.mqttLocal.publish(msg.topic, msg.payload)
 
         except Exception as err:
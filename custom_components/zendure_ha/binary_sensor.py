@@ -45,7 +45,7 @@ class ZendureBinarySensor(EntityZendure, BinarySensorEntity):
 
             self._attr_is_on = is_on
             if self.hass and self.hass.loop.is_running():
-                self.schedule_update_ha_state()
+                self.hass.loop.call_soon(self.async_write_ha_state)
         except Exception as err:
             _LOGGER.error("Error %s setting state: %s => %s", err, self._attr_unique_id, value)
 
@@ -73,6 +73,8 @@ class ZendureConfigFlow(ConfigFlow, domain=DOMAIN):
     async def async_step_user(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
         """Step when user initializes a integration."""
         errors: dict[str, str] = {}
+        await self.async_set_unique_id("Zendure", raise_on_progress=False)
+        self._abort_if_unique_id_configured()
         if user_input is not None:
             self._user_input = user_input
 
@@ -84,8 +86,6 @@ class ZendureConfigFlow(ConfigFlow, domain=DOMAIN):
                     if localmqtt:
                         return await self.async_step_local()
 
-                    await self.async_set_unique_id("Zendure", raise_on_progress=False)
-                    self._abort_if_unique_id_configured()
                     return self.async_create_entry(title="Zendure", data=self._user_input)
 
             except Exception as err:  # pylint: disable=broad-except
@@ -2,14 +2,15 @@
 
 from __future__ import annotations
 
-import asyncio
-import json
+import itertools
 import logging
-import traceback
+import time
+from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Any
 
+import orjson
 from aiohttp import ClientTimeout
 from bleak import BleakClient
 from bleak.exc import BleakError
@@ -40,43 +41,38 @@ CONST_HEADER = {"content-type": "application/json; charset=UTF-8"}
 CONST_TIMEOUT = ClientTimeout(total=4)
 SF_COMMAND_CHAR = "0000c304-0000-1000-8000-00805f9b34fb"
 
+# battery model and capacity by the first serial number character
+BATTERY_TYPES: dict[str, tuple[str, float]] = {
+    "A": ("AB1000", 0.96),
+    "B": ("AB1000S", 0.96),
+    # External AB2000X and internal AB2000X of SF800+/SF800Pro/SF1600AC+ starting with CO4A. They are also described as additional battery in the Zendure App, even when they are integrated into the device.
+    "C": ("AB2000", 1.92),
+    "F": ("AB3000", 2.88),
+    "G": ("AB3000L", 2.88),
+    # JO2A => internal battery of SF2400AC pro
+    # JO4A => internal battery of SF2400AC+
+    "J": ("I2400", 2.4),
+}
+
+# models that also depend on the fourth serial number character
+BATTERY_VARIANTS: dict[str, tuple[str, float]] = {
+    "A3": ("AIO2400", 2.4),
+    "CF": ("AB2000S", 1.92),
+    "CE": ("AB2000X", 1.92),
+}
+
+
+def json_default(o: Any) -> Any:
+    """Serialize objects in commands by their attributes."""
+    return o.__dict__
+
 
 class ZendureBattery(EntityDevice):
     """Zendure Battery class for devices."""
 
     @staticmethod
     def get_battery_type(sn: str) -> tuple[str, str, float]:
-        model = "???"
-        match sn[0]:
-            case "A":
-                if sn[3] == "3":
-                    model = "AIO2400"
-                    kWh = 2.4
-                else:
-                    model = "AB1000"
-                    kWh = 0.96
-            case "B":
-                model = "AB1000S"
-                kWh = 0.96
-            case "C":
-                # External AB2000X and internal AB2000X of SF800+/SF800Pro/SF1600AC+ starting with CO4A. They are also described as additional battery in the Zendure App, even when they are integrated into the device.
-                model = "AB2000" + ("S" if sn[3] == "F" else "X" if sn[3] == "E" else "")
-                kWh = 1.92
-            case "F":
-                model = "AB3000"
-                kWh = 2.88
-            case "G":
-                model = "AB3000L"
-                kWh = 2.88
-            case "J":
-                # JO2A => internal battery of SF2400AC pro
-                # JO4A => internal battery of SF2400AC+
-                model = "I2400"
-                kWh = 2.4
-            case _:
-                model = "Unknown"
-                kWh = 0.0
-
+        model, kWh = BATTERY_VARIANTS.get(sn[:1] + sn[3:4]) or BATTERY_TYPES.get(sn[:1], ("Unknown", 0.0))
         name = f"{model} {sn[-5:]}".strip()
         return name, model, kWh
 
@@ -122,10 +118,30 @@ class ZendureDevice(EntityDevice):
         self.topic_read = f"iot/{self.prodkey}/{self.deviceId}/properties/read"
         self.topic_write = f"iot/{self.prodkey}/{self.deviceId}/properties/write"
         self.topic_function = f"iot/{self.prodkey}/{self.deviceId}/function/invoke"
+        self.topic_replay = f"iot/{self.prodkey}/{self.deviceId}/register/replay"
+        self.topic_iot = f"iot/{self.prodkey}/{self.deviceId}/#"
+        self.topicHandlers: dict[str, Callable[[Any], bool]] = {
+            "properties/report": self.mqttReport,
+            "register/replay": self.mqttRegister,
+            "time-sync": self.mqttAccept,
+            "properties/energy": self.mqttEnergy,
+            "event/device": self.mqttAccept,
+            "event/error": self.mqttAccept,
+        }
+        # only subscribe to the topics handled by the device, for both report (/) and iot prefixes
+        self.topicFilters = [f"{prefix}/{self.prodkey}/{self.deviceId}/{topic}" for prefix in ("", "iot") for topic in self.topicHandlers]
+        # the wildcard filters, used for mqttLogging and still held by persistent sessions of earlier versions
+        self.topicWildcards = [f"/{self.prodkey}/{self.deviceId}/#", self.topic_iot]
+        self.topicUnsubscribe = self.topicFilters + self.topicWildcards
 
         self.batteries: dict[str, ZendureBattery | None] = {}
-        self.lastseen = datetime.min
-        self._messageid = 0
+        # monotonic time until the device is considered online, 0 when offline
+        self.lastseen = 0.0
+        self.lastReport = b""
+        self.pendingWrite: dict[str, Any] = {}
+        # time of the report being processed, shared by all its properties
+        self.updateTime = dt_util.now()
+        self._messageid = itertools.count(1)
         self.kWh = 0.0
 
         self.charge_limit: int = 0
@@ -143,6 +159,26 @@ class ZendureDevice(EntityDevice):
 
         self.create_entities()
 
+        # derived updates for reported properties, looked up once per changed property
+        self.propertyHandlers: dict[str, Callable[[str, Any], None]] = {
+            "packState": self.onPackState,
+            "outputPackPower": self.onCharge,
+            "packInputPower": self.onDischarge,
+            "solarInputPower": self.onSolar,
+            "gridInputPower": self.onHomeInput,
+            "outputHomePower": self.onHomeOutput,
+            "gridOffPower": self.onOffGrid,
+            "inverseMaxPower": self.onDischargeLimit,
+            "chargeLimit": self.onChargeLimit,
+            "chargeMaxLimit": self.onChargeLimit,
+            "hemsState": self.onStatus,
+            "socStatus": self.onStatus,
+            "electricLevel": self.onLevel,
+            "minSoc": self.onLevel,
+            "socLimit": self.onLevel,
+            "gridReverse": self.onGridReverse,
+        }
+
     def create_entities(self) -> None:
         """Create the device entities."""
         self.limitOutput = ZendureNumber(self, "outputLimit", self.entityWrite, None, "W", "power", self.discharge_limit, 0, NumberMode.SLIDER)
@@ -203,7 +239,7 @@ class ZendureDevice(EntityDevice):
         from .api import Api
 
         try:
-            if self.lastseen == datetime.min:
+            if self.lastseen == 0:
                 self.connectionStatus.update_value(0)
             elif self.socStatus.asInt == 1:
                 self.connectionStatus.update_value(1)
@@ -228,64 +264,72 @@ class ZendureDevice(EntityDevice):
 
         changed = super().entityUpdate(key, value)
         try:
-            if changed:
-                match key:
-                    case "packState":
-                        if value == 0:
-                            self.aggrSwitchCount.update_value(1 + self.aggrSwitchCount.asNumber)
-                    case "outputPackPower":
-                        if not self.heatState.is_on:
-                            self.aggrCharge.aggregate(dt_util.now(), value)
-                        self.aggrDischarge.aggregate(dt_util.now(), 0)
-                        self.batInOut.update_value(self.batteryOutput.asInt - self.batteryInput.asInt)
-                        self.roundtripEfficiency.update_value(round(self.aggrDischarge.asNumber / charge * 100, 1) if (charge := self.aggrCharge.asNumber) > 0 else 0)
-                    case "packInputPower":
-                        self.aggrCharge.aggregate(dt_util.now(), 0)
-                        self.aggrDischarge.aggregate(dt_util.now(), value)
-                        self.batInOut.update_value(self.batteryOutput.asInt - self.batteryInput.asInt)
-                        self.roundtripEfficiency.update_value(round(self.aggrDischarge.asNumber / charge * 100, 1) if (charge := self.aggrCharge.asNumber) > 0 else 0)
-                    case "solarInputPower":
-                        self.aggrSolar.aggregate(dt_util.now(), value)
-                    case "gridInputPower":
-                        self.aggrHomeInput.aggregate(dt_util.now(), value)
-                    case "outputHomePower":
-                        self.aggrHomeOut.aggregate(dt_util.now(), value)
-                    case "gridOffPower":
-                        self.aggrOffGrid.aggregate(dt_util.now(), value)
-                    case "inverseMaxPower":
-                        self.setLimits(self.charge_limit, value)
-                    case "chargeLimit" | "chargeMaxLimit":
-                        self.setLimits(-value, self.discharge_limit)
-                    case "hemsState" | "socStatus":
-                        self.setStatus()
-                        if key == "socStatus" and self.socStatus.asInt == 0:
-                            self.nextCalibration.update_value(dt_util.now() + timedelta(days=30))
-                    case "electricLevel" | "minSoc" | "socLimit":
-                        if self.electricLevel.asInt == 100:
-                            self.nextCalibration.update_value(dt_util.now() + timedelta(days=30))
-                        self.availableKwh.update_value((self.electricLevel.asNumber - self.minSoc.asNumber) / 100 * self.kWh)
-                    case "gridReverse":
-                        self.exports_bypass = value != 2
-        except Exception as e:
-            _LOGGER.error("EntityUpdate error %s %s %s!", self.name, key, e)
-            _LOGGER.error(traceback.format_exc())
+            if changed and (handler := self.propertyHandlers.get(key)) is not None:
+                handler(key, value)
+        except Exception:
+            _LOGGER.exception("EntityUpdate error %s %s!", self.name, key)
 
         return changed
 
+    def onPackState(self, _key: str, value: Any) -> None:
+        if value == 0:
+            self.aggrSwitchCount.update_value(1 + self.aggrSwitchCount.asNumber)
+
+    def onCharge(self, _key: str, value: Any) -> None:
+        if not self.heatState.is_on:
+            self.aggrCharge.aggregate(self.updateTime, value)
+        self.aggrDischarge.aggregate(self.updateTime, 0)
+        self.updateBatInOut()
+
+    def onDischarge(self, _key: str, value: Any) -> None:
+        self.aggrCharge.aggregate(self.updateTime, 0)
+        self.aggrDischarge.aggregate(self.updateTime, value)
+        self.updateBatInOut()
+
+    def updateBatInOut(self) -> None:
+        self.batInOut.update_value(self.batteryOutput.asInt - self.batteryInput.asInt)
+        self.roundtripEfficiency.update_value(round(self.aggrDischarge.asNumber / charge * 100, 1) if (charge := self.aggrCharge.asNumber) > 0 else 0)
+
+    def onSolar(self, _key: str, value: Any) -> None:
+        self.aggrSolar.aggregate(self.updateTime, value)
+
+    def onHomeInput(self, _key: str, value: Any) -> None:
+        self.aggrHomeInput.aggregate(self.updateTime, value)
+
+    def onHomeOutput(self, _key: str, value: Any) -> None:
+        self.aggrHomeOut.aggregate(self.updateTime, value)
+
+    def onOffGrid(self, _key: str, value: Any) -> None:
+        self.aggrOffGrid.aggregate(self.updateTime, value)
+
+    def onDischargeLimit(self, _key: str, value: Any) -> None:
+        self.setLimits(self.charge_limit, value)
+
+    def onChargeLimit(self, _key: str, value: Any) -> None:
+        self.setLimits(-value, self.discharge_limit)
+
+    def onStatus(self, key: str, _value: Any) -> None:
+        self.setStatus()
+        if key == "socStatus" and self.socStatus.asInt == 0:
+            self.nextCalibration.update_value(self.updateTime + timedelta(days=30))
+
+    def onLevel(self, _key: str, _value: Any) -> None:
+        if self.electricLevel.asInt == 100:
+            self.nextCalibration.update_value(self.updateTime + timedelta(days=30))
+        self.availableKwh.update_value((self.electricLevel.asNumber - self.minSoc.asNumber) / 100 * self.kWh)
+
+    def onGridReverse(self, _key: str, value: Any) -> None:
+        self.exports_bypass = value != 2
+
     def calcRemainingTime(self) -> float:
         """Calculate the remaining time."""
-        level = self.electricLevel.asInt
-        power = self.batteryOutput.asInt - self.batteryInput.asInt
-
-        if power == 0:
+        if (power := self.batteryOutput.asInt - self.batteryInput.asInt) == 0:
             return 0
 
-        if power < 0:
-            soc = self.socSet.asNumber
-            return 0 if level >= soc else min(999, self.kWh * 10 / -power * (soc - level))
-
-        soc = self.minSoc.asNumber
-        return 0 if level <= soc else min(999, self.kWh * 10 / power * (level - soc))
+        # soc still to charge up to socSet, or to discharge down to minSoc
+        level = self.electricLevel.asInt
+        delta = self.socSet.asNumber - level if power < 0 else level - self.minSoc.asNumber
+        return 0 if delta <= 0 else min(999, self.kWh * 10 * delta / abs(power))
 
     async def entityWrite(self, entity: EntityZendure, value: Any) -> None:
         if entity.translation_key is None:
@@ -293,46 +337,52 @@ class ZendureDevice(EntityDevice):
             return
 
         _LOGGER.info("Writing property %s %s => %s", self.name, entity.propertyName, value)
-        self._messageid += 1
-        payload = json.dumps(
-            {
-                "deviceId": self.deviceId,
-                "messageId": self._messageid,
-                "timestamp": int(datetime.now().timestamp()),
-                "properties": {entity.propertyName: value},
-            },
-            default=lambda o: o.__dict__,
-        )
-        if self.mqtt is not None:
-            self.mqtt.publish(self.topic_write, payload)
+        self.mqttWrite({entity.propertyName: value})
 
     async def button_press(self, _key: str) -> None:
         return
 
     def mqttPublish(self, topic: str, command: Any, client: mqtt_client.Client | None = None) -> None:
-        command["messageId"] = self._messageid
+        # send queued writes first, so messages keep the order in which they were issued
+        if self.pendingWrite and topic != self.topic_write:
+            self.mqttWriteFlush()
+        command["messageId"] = next(self._messageid)
         command["deviceId"] = self.deviceId
-        command["timestamp"] = int(datetime.now().timestamp())
-        payload = json.dumps(command, default=lambda o: o.__dict__)
+        command["timestamp"] = int(time.time())
+        payload = orjson.dumps(command, default=json_default)
 
         if client is not None:
             client.publish(topic, payload)
         elif self.mqtt is not None:
             self.mqtt.publish(topic, payload)
 
+    def mqttWrite(self, properties: dict[str, Any], immediate: bool = False) -> None:
+        """Queue properties, all writes of this loop iteration are sent as one properties/write."""
+        if not self.pendingWrite and not immediate:
+            self.hass.loop.call_soon(self.mqttWriteFlush)
+        self.pendingWrite.update(properties)
+        if immediate:
+            self.mqttWriteFlush()
+
+    def mqttWriteFlush(self) -> None:
+        properties, self.pendingWrite = self.pendingWrite, {}
+        if properties and self.mqtt is not None:
+            self.mqttPublish(self.topic_write, {"properties": properties}, self.mqtt)
+
     def mqttInvoke(self, command: Any) -> None:
-        self._messageid += 1
-        command["messageId"] = self._messageid
+        # messageId and timestamp are set by mqttPublish
         command["deviceKey"] = self.deviceId
-        command["timestamp"] = int(datetime.now().timestamp())
         self.mqttPublish(self.topic_function, command)
 
-    async def mqttProperties(self, payload: Any) -> None:
-        if self.lastseen == datetime.min:
-            self.lastseen = datetime.now() + timedelta(minutes=5)
+    def mqttSeen(self) -> None:
+        offline = self.lastseen == 0
+        self.lastseen = time.monotonic() + 300
+        if offline:
             self.setStatus()
-        else:
-            self.lastseen = datetime.now() + timedelta(minutes=5)
+
+    def mqttProperties(self, payload: Any) -> None:
+        self.mqttSeen()
+        self.updateTime = dt_util.now()
 
         if (properties := payload.get("properties", None)) and len(properties) > 0:
             for key, value in properties.items():
@@ -340,13 +390,18 @@ class ZendureDevice(EntityDevice):
 
         # update the battery properties
         if batprops := payload.get("packData", None):
+            added: float | None = None
             for b in batprops:
                 if (sn := b.get("sn", None)) is None:
                     continue
 
                 if (bat := self.batteries.get(sn, None)) is None:
+                    from .api import Api
+
                     bat = ZendureBattery(self.hass, sn, self)
                     self.batteries[sn] = bat
+                    Api.deviceNames[bat.name] = (self.deviceId, sn)
+                    added = (added or 0.0) + bat.kWh
 
                 # Always apply properties — including for newly created batteries.
                 # With elif, a new battery received no entityUpdate on its first packData
@@ -358,53 +413,51 @@ class ZendureDevice(EntityDevice):
                         if key != "sn":
                             bat.entityUpdate(key, value)
 
-            # Recalculate total capacity after every packData update
-            # (covers both new batteries and potential pack changes)
-            self.kWh = sum(0 if b is None else b.kWh for b in self.batteries.values())
-            self.totalKwh.update_value(self.kWh)
-            self.availableKwh.update_value((self.electricLevel.asNumber - self.minSoc.asNumber) / 100 * self.kWh)
+            # update the capacity once for all new batteries in this report
+            if added is not None:
+                self.batteryCapacity(added)
+
+    def batteryCapacity(self, delta: float) -> None:
+        """Adjust the total capacity when a battery is added or removed."""
+        self.kWh = max(0.0, self.kWh + delta)
+        self.totalKwh.update_value(self.kWh)
+        self.availableKwh.update_value((self.electricLevel.asNumber - self.minSoc.asNumber) / 100 * self.kWh)
 
     def mqttMessage(self, topic: str, payload: Any) -> bool:
+        # topics without a handler (properties/read, function/invoke, config, log, ...) are not ours
+        if (handler := self.topicHandlers.get(topic)) is None:
+            return False
         try:
-            match topic:
-                case "properties/report":
-                    asyncio.run_coroutine_threadsafe(self.mqttProperties(payload), self.hass.loop)
-                    # self.mqttProperties(payload)
-
-                case "register/replay":
-                    _LOGGER.info("Register replay for %s => %s", self.name, payload)
-                    if self.mqtt is not None:
-                        self.mqtt.publish(f"iot/{self.prodkey}/{self.deviceId}/register/replay", None, 1, True)
-
-                case "time-sync":
-                    return True
-
-                case "properties/energy":
-                    self.hemsState.update_value(1)
-                    self.hemsStateUpdated = datetime.now()
-                    self.setStatus()
-                    return True
-
-                case "event/device" | "event/error":
-                    return True
-
-                case "properties/read" | "function/invoke/reply" | "properties/read/reply" | "config" | "log" | "function/invoke":
-                    return False
-
-                # case "firmware/report":
-                #     _LOGGER.info("Firmware report for %s => %s", self.name, payload)
-                case _:
-                    return False
+            return handler(payload)
         except Exception as err:
             _LOGGER.error(err)
 
         return True
 
+    def mqttReport(self, payload: Any) -> bool:
+        self.mqttProperties(payload)
+        return True
+
+    def mqttRegister(self, payload: Any) -> bool:
+        _LOGGER.info("Register replay for %s => %s", self.name, payload)
+        if self.mqtt is not None:
+            self.mqtt.publish(self.topic_replay, None, 1, True)
+        return True
+
+    def mqttEnergy(self, _payload: Any) -> bool:
+        self.hemsState.update_value(1)
+        self.hemsStateUpdated = datetime.now()
+        self.setStatus()
+        return True
+
+    def mqttAccept(self, _payload: Any) -> bool:
+        return True
+
     async def mqttSelect(self, _select: ZendureRestoreSelect, _value: Any) -> None:
         from .api import Api
 
         self.mqtt = None
-        if self.lastseen != datetime.min:
+        if self.lastseen != 0:
             if self.connection.value == 0:
                 await self.bleMqtt(Api.mqttCloud)
             elif self.connection.value == 1:
@@ -586,8 +639,7 @@ class ZendureDevice(EntityDevice):
             else:
                 self.mqtt = mqtt
                 if self.zendure is not None:
-                    self.zendure.loop_stop()
-                    self.zendure.disconnect()
+                    Api.mqttStop(self.zendure)
                     self.zendure = None
 
                 self.mqttPublish(self.topic_read, {"properties": ["getAll"]}, self.mqtt)
@@ -608,18 +660,15 @@ class ZendureDevice(EntityDevice):
 
     async def bleCommand(self, client: BleakClient, command: Any) -> None:
         try:
-            self._messageid += 1
-            payload = json.dumps(command, default=lambda o: o.__dict__)
-            b = bytearray()
-            b.extend(map(ord, payload))
+            payload = orjson.dumps(command, default=json_default)
             _LOGGER.info("BLE command: %s => %s", self.name, payload)
-            await client.write_gatt_char(SF_COMMAND_CHAR, b, response=False)
+            await client.write_gatt_char(SF_COMMAND_CHAR, payload, response=False)
         except Exception as err:
             _LOGGER.warning("BLE error: %s", err)
 
     async def power_get(self) -> bool:
-        if self.lastseen < datetime.now():
-            self.lastseen = datetime.min
+        if self.lastseen < time.monotonic():
+            self.lastseen = 0.0
             self.setStatus()
 
         self.actualKwh = self.availableKwh.asNumber
@@ -701,18 +750,15 @@ class ZendureLegacy(ZendureDevice):
         """Refresh the device data."""
         from .api import Api
 
-        if self.lastseen != datetime.min:
+        if self.lastseen != 0:
             self.mqttPublish(self.topic_read, {"properties": ["getAll"]}, self.mqtt)
         else:
             self.mqttPublish(self.topic_read, {"properties": ["getAll"]}, Api.mqttCloud)
             self.mqttPublish(self.topic_read, {"properties": ["getAll"]}, Api.mqttLocal)
 
-    def mqttMessage(self, topic: str, payload: Any) -> bool:
-        if topic == "register/replay":
-            _LOGGER.info("Register replay for %s => %s", self.name, payload)
-            return True
-
-        return super().mqttMessage(topic, payload)
+    def mqttRegister(self, payload: Any) -> bool:
+        _LOGGER.info("Register replay for %s => %s", self.name, payload)
+        return True
 
 
 class ZendureZenSdk(ZendureDevice):
@@ -731,12 +777,10 @@ class ZendureZenSdk(ZendureDevice):
         self.mqtt = None
         match select.value:
             case 0:
-                Api.mqttCloud.unsubscribe(f"/{self.prodkey}/{self.deviceId}/#")
-                Api.mqttCloud.unsubscribe(f"iot/{self.prodkey}/{self.deviceId}/#")
+                Api.mqttCloud.unsubscribe(self.topicUnsubscribe)
 
             case 2:
-                Api.mqttCloud.unsubscribe(f"/{self.prodkey}/{self.deviceId}/#")
-                Api.mqttCloud.unsubscribe(f"iot/{self.prodkey}/{self.deviceId}/#")
+                Api.mqttCloud.unsubscribe(self.topicUnsubscribe)
 
         _LOGGER.debug("Mqtt selected %s", self.name)
 
@@ -754,13 +798,13 @@ class ZendureZenSdk(ZendureDevice):
     async def dataRefresh(self, update_count: int) -> None:
         if update_count == 0 and not self.online:
             json = await self.httpGet("properties/report")
-            await self.mqttProperties(json)
+            self.mqttProperties(json)
 
     async def power_get(self) -> bool:
         """Get the current power."""
         if self.connection.value != 0:
             json = await self.httpGet("properties/report")
-            await self.mqttProperties(json)
+            self.mqttProperties(json)
 
         return await super().power_get()
 
@@ -789,18 +833,19 @@ class ZendureZenSdk(ZendureDevice):
         if self.connection.value != 0:
             await self.httpPost("properties/write", command)
         else:
-            self.mqttPublish(self.topic_write, command, self.mqtt)
+            # power setpoints are sent right away, together with any queued writes
+            self.mqttWrite(command["properties"], immediate=True)
 
     async def httpGet(self, url: str, key: str | None = None) -> dict[str, Any]:
         try:
             url = f"http://{self.ipAddress}/{url}"
             response = await self.session.get(url, headers=CONST_HEADER, timeout=CONST_TIMEOUT)
-            payload = json.loads(await response.text())
-            self.lastseen = datetime.now()
+            payload = orjson.loads(await response.read())
+            self.lastseen = time.monotonic()
             return payload if key is None else payload.get(key, {})
         except Exception as e:
             _LOGGER.error("%s for %s during httpGet%s", type(e).__name__, self.name, f": {e}" if str(e) else "!")
-            self.lastseen = datetime.min
+            self.lastseen = 0.0
         return {}
 
     async def httpPost(self, url: str, command: Any) -> bool:
@@ -812,7 +857,7 @@ class ZendureZenSdk(ZendureDevice):
             await self.session.post(url, json=command, headers=CONST_HEADER, timeout=CONST_TIMEOUT)
         except Exception as e:
             _LOGGER.error("%s for %s during httpPost%s", type(e).__name__, self.name, f": {e}" if str(e) else "!")
-            self.lastseen = datetime.min
+            self.lastseen = 0.0
             return False
         return True
 
@@ -2,13 +2,13 @@
 
 from __future__ import annotations
 
-import json
 import logging
 import re
 import unicodedata
 from pathlib import Path
 from typing import Any
 
+import orjson
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers import entity_registry as er
@@ -223,13 +223,13 @@ class EntityDevice:
 
     def check_entities(self, di: DeviceEntry, name: str) -> None:
         if EntityDevice.checkEntity is None:
-            _t = json.loads((Path(__file__).parent / "translations" / "en.json").read_text())
+            _t = orjson.loads((Path(__file__).parent / "translations" / "en.json").read_bytes())
             EntityDevice.checkEntity = {key: domain for domain, keys in _t.get("entity", {}).items() for key in keys}
 
         # Get all entities for this device and group them by translation_key if they match the current device and platform
         entity_registry = er.async_get(self.hass)
         ed: dict[str, list[er.RegistryEntry]] = {}
-        for entity in er.async_entries_for_device(entity_registry, di.id, True):
+        for entity in entity_registry.entities.get_entries_for_device_id(di.id, True):
             if entity.platform == DOMAIN and (dn := self.checkEntity.get(entity.translation_key)) is not None and dn == entity.domain:
                 ed.setdefault(entity.translation_key, []).append(entity)
 
@@ -254,13 +254,13 @@ class EntityDevice:
         return
 
     def entityUpdate(self, key: Any, value: Any) -> bool:  # noqa: PLR0915
-        from .binary_sensor import ZendureBinarySensor
-        from .select import ZendureSelect
-        from .sensor import ZendureCalcSensor, ZendureSensor
-        from .switch import ZendureSwitch
-
         # check if entity is already created
         if (entity := self.entities.get(key, None)) is None:
+            from .binary_sensor import ZendureBinarySensor
+            from .select import ZendureSelect
+            from .sensor import ZendureCalcSensor, ZendureSensor
+            from .switch import ZendureSwitch
+
             if info := self.createEntity.get(key, None):
                 match info if isinstance(info, str) else info[0]:
                     case "W":
@@ -321,8 +321,9 @@ class EntityDevice:
                 entity.update_value(value)
             return True
 
-        # update entity state
-        if entity is not None and entity.platform and entity.state != value:
+        # update entity state, entities disabled in HA are never added to a platform
+        # update_value does its own change check, so skip evaluating the (formatted) entity.state
+        if entity is not None and entity.platform:
             return entity.update_value(value)
 
         return False
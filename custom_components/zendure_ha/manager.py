@@ -4,16 +4,16 @@ from __future__ import annotations
 
 import asyncio
 import hashlib
-import json
 import logging
-import traceback
 from collections import deque
 from collections.abc import Callable
 from datetime import datetime, timedelta
 from math import sqrt
 from pathlib import Path
+from time import monotonic
 from typing import Any
 
+import orjson
 from homeassistant.auth.const import GROUP_ID_USER
 from homeassistant.auth.providers import homeassistant as auth_ha
 from homeassistant.components import bluetooth, persistent_notification
@@ -45,6 +45,28 @@ SCAN_INTERVAL = timedelta(seconds=60)
 
 _LOGGER = logging.getLogger(__name__)
 
+FUSEGROUP_OPTIONS: dict[Any, str] = {
+    0: "unused",
+    1: "owncircuit",
+    2: "group800",
+    3: "group800_2400",
+    4: "group1200",
+    5: "group2000",
+    6: "group2400",
+    7: "group3600",
+}
+
+# maximum output and input power of each fusegroup selection
+FUSEGROUP_LIMITS: dict[str, tuple[int, int]] = {
+    "owncircuit": (3600, -3600),
+    "group800": (800, -1200),
+    "group800_2400": (800, -2400),
+    "group1200": (1200, -1200),
+    "group2000": (2000, -2000),
+    "group2400": (2400, -2400),
+    "group3600": (3600, -3600),
+}
+
 type ZendureConfigEntry = ConfigEntry[ZendureManager]
 
 
@@ -61,9 +83,9 @@ class ZendureManager(DataUpdateCoordinator[None], EntityDevice):
         EntityDevice.__init__(self, hass, "Zendure Manager", "Zendure Manager")
         self.api = Api()
         self.operation: ManagerMode = ManagerMode.OFF
-        self.zero_next = datetime.min
-        self.zero_fast = datetime.min
-        self.check_reset = datetime.min
+        # monotonic deadlines for the next regular and fast power distribution
+        self.zero_next = 0.0
+        self.zero_fast = 0.0
         self.p1meterEvent: Callable[[], None] | None = None
         self.p1_history: deque[int] = deque([25, -25], maxlen=8)
         self.p1_factor = 1
@@ -72,8 +94,9 @@ class ZendureManager(DataUpdateCoordinator[None], EntityDevice):
         self.charge: list[ZendureDevice] = []
         self.charge_limit = 0
         self.charge_optimal = 0
-        self.charge_time = datetime.max
-        self.charge_last = datetime.min
+        # monotonic charge hysteresis deadline, inf when not waiting to charge
+        self.charge_time = float("inf")
+        self.charge_last = float("-inf")
         self.charge_weight = 0
 
         self.discharge: list[ZendureDevice] = []
@@ -113,6 +136,7 @@ class ZendureManager(DataUpdateCoordinator[None], EntityDevice):
         self.globalSoc = ZendureSensor(self, "global_soc", None, "%", "battery", "measurement", 1)
 
         # load devices
+        auto_mqtt = self.config_entry.data.get(CONF_AUTO_MQTT_USER, False)
         for dev in data["deviceList"]:
             try:
                 if (deviceId := dev["deviceKey"]) is None or (prodModel := dev["productModel"]) is None:
@@ -129,12 +153,12 @@ class ZendureManager(DataUpdateCoordinator[None], EntityDevice):
                 device.discharge_start = device.discharge_limit // 10
                 device.discharge_optimal = device.discharge_limit // 4
                 Api.devices[deviceId] = device
+                Api.deviceNames[device.name] = (deviceId, None)
 
                 # Check if we should automatically manage MQTT users (opt-in)
-                auto_mqtt = self.config_entry.data.get(CONF_AUTO_MQTT_USER, False)
                 if auto_mqtt and Api.localServer is not None and Api.localServer != "":
                     try:
-                        psw = hashlib.md5(deviceId.encode()).hexdigest().upper()[8:24]  # noqa: S324
+                        psw = hashlib.md5(deviceId.encode(), usedforsecurity=False).hexdigest().upper()[8:24]
                         provider: auth_ha.HassAuthProvider = auth_ha.async_get_provider(self.hass)
                         credentials = await provider.async_get_or_create_credentials({"username": deviceId.lower()})
                         user = await self.hass.auth.async_get_user_by_credentials(credentials)
@@ -153,79 +177,53 @@ class ZendureManager(DataUpdateCoordinator[None], EntityDevice):
                 elif auto_mqtt:
                     _LOGGER.debug("Skipping auto MQTT user creation for %s: Local server not configured.", deviceId)
 
-            except Exception as e:
-                _LOGGER.error("Unable to create device %s!", e)
-                _LOGGER.error(traceback.format_exc())
+            except Exception:
+                _LOGGER.exception("Unable to create device %s!", dev.get("deviceKey"))
 
         self.devices = list(Api.devices.values())
         _LOGGER.info("Loaded %s devices", len(self.devices))
 
         # initialize the api & p1 meter
-        self.api.Init(self.config_entry.data, mqtt)
+        self.api.Init(self.hass, self.config_entry.data, mqtt)
         await self.update_fusegroups()
         self.update_p1meter(self.config_entry.data.get(CONF_P1METER, "sensor.power_actual"))
         await asyncio.sleep(1)  # allow other tasks to run
 
+    async def updateFuseGroup(self, _entity: ZendureRestoreSelect, _value: Any) -> None:
+        await self.update_fusegroups()
+
     async def update_fusegroups(self) -> None:
         _LOGGER.info("Update fusegroups")
 
-        # updateFuseGroup callback
-        async def updateFuseGroup(_entity: ZendureRestoreSelect, _value: Any) -> None:
-            await self.update_fusegroups()
-
         fuseGroups: dict[str, FuseGroup] = {}
         for device in self.devices:
             try:
                 if device.fuseGroup.onchanged is None:
-                    device.fuseGroup.onchanged = updateFuseGroup
-
-                fg: FuseGroup | None = None
-                match device.fuseGroup.state:
-                    case "owncircuit" | "group3600":
-                        fg = FuseGroup(device.name, 3600, -3600)
-                    case "group800":
-                        fg = FuseGroup(device.name, 800, -1200)
-                    case "group800_2400":
-                        fg = FuseGroup(device.name, 800, -2400)
-                    case "group1200":
-                        fg = FuseGroup(device.name, 1200, -1200)
-                    case "group2000":
-                        fg = FuseGroup(device.name, 2000, -2000)
-                    case "group2400":
-                        fg = FuseGroup(device.name, 2400, -2400)
-                    case "unused":
-                        # only switch off, if Manager is used
-                        if self.operation != ManagerMode.OFF:
-                            await device.power_off()
-                        continue
-                    case _:
-                        _LOGGER.debug("Device %s has unsupported fuseGroup state: %s", device.name, device.fuseGroup.state)
-                        continue
+                    device.fuseGroup.onchanged = self.updateFuseGroup
 
-                if fg is not None:
+                state = device.fuseGroup.state
+                if (limits := FUSEGROUP_LIMITS.get(state)) is not None:
+                    fg = FuseGroup(device.name, *limits)
                     fg.devices.append(device)
                     fuseGroups[device.deviceId] = fg
+                elif state == "unused":
+                    # only switch off, if Manager is used
+                    if self.operation != ManagerMode.OFF:
+                        await device.power_off()
+                else:
+                    _LOGGER.debug("Device %s has unsupported fuseGroup state: %s", device.name, state)
             except AttributeError as err:
                 _LOGGER.error("Device %s missing fuseGroup attribute: %s", device.name, err)
             except Exception as err:
                 _LOGGER.error("Unable to create fusegroup for device %s (%s): %s", device.name, device.deviceId, err, exc_info=True)
 
-        # Update the fusegroups and select options for each device
+        # Update the fusegroups and select options for each device, the options are the same except for the device itself
+        # setDict skips devices whose options and selection are unchanged
+        options: dict[Any, str] = FUSEGROUP_OPTIONS | {deviceId: f"Part of {fg.name} fusegroup" for deviceId, fg in fuseGroups.items()}
         for device in self.devices:
             try:
-                fusegroups: dict[Any, str] = {
-                    0: "unused",
-                    1: "owncircuit",
-                    2: "group800",
-                    3: "group800_2400",
-                    4: "group1200",
-                    5: "group2000",
-                    6: "group2400",
-                    7: "group3600",
-                }
-                for deviceId, fg in fuseGroups.items():
-                    if deviceId != device.deviceId:
-                        fusegroups[deviceId] = f"Part of {fg.name} fusegroup"
+                fusegroups = options.copy()
+                fusegroups.pop(device.deviceId, None)
                 device.fuseGroup.setDict(fusegroups)
             except AttributeError as err:
                 _LOGGER.error("Device %s missing fuseGroup attribute: %s", device.name, err)
@@ -285,10 +283,14 @@ class ZendureManager(DataUpdateCoordinator[None], EntityDevice):
 
         time = datetime.now()
         kwh = 0
+        discovered: list[bluetooth.BluetoothServiceInfoBleak] | None = None
         for device in self.devices:
             kwh += device.kWh
             if isinstance(device, ZendureLegacy) and device.bleMac is None:
-                for si in bluetooth.async_discovered_service_info(self.hass, False):
+                # query the discovered bluetooth devices only once per update
+                if discovered is None:
+                    discovered = list(bluetooth.async_discovered_service_info(self.hass, False))
+                for si in discovered:
                     if isBleDevice(device, si):
                         break
 
@@ -324,7 +326,7 @@ class ZendureManager(DataUpdateCoordinator[None], EntityDevice):
                     + ";".join(
                         [
                             f"bat;Prod;Home;{
-                                json.dumps(
+                                orjson.dumps(
                                     DeviceSettings(
                                         d.name,
                                         d.fuseGrp.name,
@@ -334,9 +336,8 @@ class ZendureManager(DataUpdateCoordinator[None], EntityDevice):
                                         d.kWh,
                                         d.socSet.asNumber,
                                         d.minSoc.asNumber,
-                                    ),
-                                    default=vars,
-                                )
+                                    )
+                                ).decode()
                             }"
                             for d in self.devices
                         ]
@@ -360,7 +361,7 @@ class ZendureManager(DataUpdateCoordinator[None], EntityDevice):
 
     async def _p1_changed(self, event: Event[EventStateChangedData]) -> None:
         # exit if there is nothing to do
-        if not self.hass.is_running or not self.hass.is_running or (new_state := event.data["new_state"]) is None:
+        if not self.hass.is_running or (new_state := event.data["new_state"]) is None:
             return
 
         try:  # convert the state to a float
@@ -368,31 +369,31 @@ class ZendureManager(DataUpdateCoordinator[None], EntityDevice):
         except ValueError:
             return
 
-        # Get time & update simulation
-        time = datetime.now()
+        # update simulation
         if ZendureManager.simulation:
-            self.writeSimulation(time, p1)
+            self.writeSimulation(datetime.now(), p1)
 
         # Check for fast delay
-        if time < self.zero_fast:
-            self.p1_history.append(p1)
+        history = self.p1_history
+        if (now := monotonic()) < self.zero_fast:
+            history.append(p1)
             return
 
         # calculate the standard deviation
-        if len(self.p1_history) > 1:
-            avg = int(sum(self.p1_history) / len(self.p1_history))
-            stddev = SmartMode.P1_STDDEV_FACTOR * max(SmartMode.P1_STDDEV_MIN, sqrt(sum([pow(i - avg, 2) for i in self.p1_history]) / len(self.p1_history)))
-            if isFast := abs(p1 - avg) > stddev or abs(p1 - self.p1_history[0]) > stddev:
-                self.p1_history.clear()
+        if (count := len(history)) > 1:
+            avg = int(sum(history) / count)
+            stddev = SmartMode.P1_STDDEV_FACTOR * max(SmartMode.P1_STDDEV_MIN, sqrt(sum((i - avg) ** 2 for i in history) / count))
+            if isFast := abs(p1 - avg) > stddev or abs(p1 - history[0]) > stddev:
+                history.clear()
         else:
             isFast = False
-        self.p1_history.append(p1)
+        history.append(p1)
 
         # check minimal time between updates
-        if isFast or time > self.zero_next:
+        if isFast or now > self.zero_next:
             try:
                 # prevent updates during power distribution changes
-                self.zero_fast = datetime.max
+                self.zero_fast = float("inf")
                 self.charge.clear()
                 self.charge_limit = 0
                 self.charge_optimal = 0
@@ -409,16 +410,15 @@ class ZendureManager(DataUpdateCoordinator[None], EntityDevice):
                 self.produced = 0
                 for fg in self.fuseGroups:
                     fg.initPower = True
-                await self.powerChanged(p1, isFast, time)
-            except Exception as err:
-                _LOGGER.error(err)
-                _LOGGER.error(traceback.format_exc())
+                await self.powerChanged(p1, isFast, now)
+            except Exception:
+                _LOGGER.exception("Unable to distribute power")
 
-            time = datetime.now()
-            self.zero_next = time + timedelta(seconds=SmartMode.TIMEZERO)
-            self.zero_fast = time + timedelta(seconds=SmartMode.TIMEFAST)
+            now = monotonic()
+            self.zero_next = now + SmartMode.TIMEZERO
+            self.zero_fast = now + SmartMode.TIMEFAST
 
-    async def powerChanged(self, p1: int, isFast: bool, time: datetime) -> None:
+    async def powerChanged(self, p1: int, isFast: bool, time: float) -> None:
         """Return the distribution setpoint."""
         availableKwh = 0
         setpoint = p1
@@ -510,7 +510,7 @@ class ZendureManager(DataUpdateCoordinator[None], EntityDevice):
             case ManagerMode.OFF:
                 self.operationstate.update_value(ManagerState.OFF.value)
 
-    async def power_charge(self, setpoint: int, time: datetime) -> None:
+    async def power_charge(self, setpoint: int, time: float) -> None:
         """Charge devices."""
         _LOGGER.info("Charge => setpoint %sW", setpoint)
 
@@ -524,8 +524,8 @@ class ZendureManager(DataUpdateCoordinator[None], EntityDevice):
 
         # prevent hysteria
         if self.charge_time > time:
-            if self.charge_time == datetime.max:
-                self.charge_time = time + timedelta(seconds=2 if (time - self.charge_last).total_seconds() > 300 else 60)
+            if self.charge_time == float("inf"):
+                self.charge_time = time + (2 if time - self.charge_last > 300 else 60)
                 self.charge_last = self.charge_time
                 self.pwr_low = 0
             setpoint = 0
@@ -582,8 +582,8 @@ class ZendureManager(DataUpdateCoordinator[None], EntityDevice):
         self.operationstate.update_value(ManagerState.DISCHARGE.value if setpoint > 0 and self.discharge else ManagerState.IDLE.value)
 
         # reset hysteria time
-        if self.charge_time != datetime.max:
-            self.charge_time = datetime.max
+        if self.charge_time != float("inf"):
+            self.charge_time = float("inf")
             self.pwr_low = 0
 
         # stop charging devices
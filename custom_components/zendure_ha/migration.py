@@ -15,37 +15,97 @@ from .entity import snakecase
 
 _LOGGER = logging.getLogger(__name__)
 
+STORAGE_PREFIXES = ("core.automation", "lovelace", "energy")
+CONFIG_SUFFIXES = frozenset({".yaml", ".json"})
+
 
 class Migration:
     """Handles device/entity rename migrations."""
 
     repairs = {"i_o_t_state": "iotstate", "o_t_a_state": "otastate", "l_c_n_state": "lcnstate", "local_a_p_i_enable": "local_apienable", "is_error": ""}
+    translationKeys: dict[str, str] = {}
+
+    @staticmethod
+    def translation_key(key: str) -> str:
+        """Return the migrated translation key, an empty key means the entity must be removed."""
+        if (uniqueid := Migration.translationKeys.get(key)) is None:
+            uniqueid = snakecase(Migration.repairs.get(key, key))
+            if uniqueid.startswith("aggr") and uniqueid.endswith("total"):
+                uniqueid = uniqueid.replace("_total", "")
+            Migration.translationKeys[key] = uniqueid
+        return uniqueid
 
     @staticmethod
     def check_device(hass: HomeAssistant, device_id: str, name: str, model: str, sn: str) -> None:
         """Track cloud-side device renames via name_by_user for the next migration."""
-        device_registry = dr.async_get(hass)
-
-        fallback = f"{model.replace(' ', '').replace('SolarFlow', 'Sf')} {sn[-3:] if sn is not None else ''}".strip()
-        unique = "".join(name.split())
-        identifier = device_id or name
-        if not identifier:
+        if not (identifier := device_id or name):
             return
 
+        device_registry = dr.async_get(hass)
         existing = device_registry.async_get_device(identifiers={(DOMAIN, identifier)})
         if existing is None:
-            for ident in [name, name.lower(), unique, fallback, fallback.lower()]:
+            # only build the legacy identifiers when the direct lookup fails
+            fallback = f"{model.replace(' ', '').replace('SolarFlow', 'Sf')} {sn[-3:] if sn is not None else ''}".strip()
+            for ident in dict.fromkeys((name, name.lower(), "".join(name.split()), fallback, fallback.lower())):
                 existing = device_registry.async_get_device(identifiers={(DOMAIN, ident)})
                 if existing is not None:
                     break
 
-        if not existing:
+        if existing is None or name == existing.name:
             return
 
-        if name != existing.name and existing.name_by_user is None:
+        if existing.name_by_user is None:
             _LOGGER.info("Device '%s' renamed to '%s' in cloud, storing for next migration", existing.name, name)
             device_registry.async_update_device(existing.id, name_by_user=name)
 
+    @staticmethod
+    def _change_id(data: dict, oid: str, nid: str) -> bool:
+        """Replace an old entity ID with a new one in (nested) config entry data."""
+        changed = False
+        for key, value in data.items():
+            if isinstance(value, dict):
+                changed |= Migration._change_id(value, oid, nid)
+            elif isinstance(value, list):
+                for i, item in enumerate(value):
+                    if isinstance(item, str) and oid in item:
+                        value[i] = item.replace(oid, nid)
+                        changed = True
+            elif isinstance(value, str) and oid in value:
+                data[key] = value.replace(oid, nid)
+                changed = True
+        return changed
+
+    @staticmethod
+    def _rename_entities(entity_registry: er.EntityRegistry, data: rs.RestoreStateData, pending: list[tuple[str, str, str, str]], changes: list[tuple[str, str]]) -> None:
+        """Rename entities whose target is free first, renames that block each other free the first target."""
+        while pending:
+            ready = [u for u in pending if u[1] == u[0] or entity_registry.async_get(u[1]) is None]
+            if not ready:
+                # the renames block each other, free the first target like a conflict
+                entity_registry.async_remove(pending[0][1])
+                pending = [u for u in pending if entity_registry.async_get(u[0]) is not None]
+                continue
+
+            for entity_id, entityid, unique_id, uniqueid in ready:
+                pending.remove((entity_id, entityid, unique_id, uniqueid))
+                if entityid != entity_id and entity_registry.async_get(entityid) is not None:
+                    # another rename in this pass took the target
+                    pending.append((entity_id, entityid, unique_id, uniqueid))
+                    continue
+                try:
+                    if (rstate := data.last_states.pop(entity_id, None)) is not None:
+                        data.last_states[entityid] = rstate
+                    entity_registry.async_update_entity(
+                        entity_id,
+                        new_unique_id=unique_id,
+                        new_entity_id=entityid,
+                        translation_key=uniqueid,
+                    )
+                    _LOGGER.debug("Migrated entity %s -> %s", entity_id, entityid)
+                    changes.append((entity_id, entityid))
+                except Exception as e:
+                    _LOGGER.error("Failed to migrate entity %s: %s", entity_id, e)
+
     @staticmethod
     def _update_files(hass: HomeAssistant, changes: list[tuple[str, str]]) -> bool:
         """Replace old entity IDs with new ones in storage and config files."""
@@ -66,7 +126,7 @@ class Migration:
 
         storage_dir = Path(hass.config.path(".storage"))
         for path in storage_dir.iterdir():
-            if any(path.name.startswith(f) for f in ["core.automation", "lovelace", "energy"]):
+            if path.name.startswith(STORAGE_PREFIXES):
                 update_file(path)
 
         config_path = Path(hass.config.config_dir)
@@ -75,7 +135,7 @@ class Migration:
                 continue
             if any(part.startswith(".") for part in path.relative_to(config_path).parts):
                 continue
-            if path.suffix in (".yaml", ".json"):
+            if path.suffix in CONFIG_SUFFIXES:
                 update_file(path)
 
         return file_modified
@@ -88,7 +148,10 @@ class Migration:
         data = rs.async_get(hass)
         changes: list[tuple[str, str]] = []
 
-        devices = dr.async_entries_for_config_entry(device_registry, entryid)
+        if not (devices := dr.async_entries_for_config_entry(device_registry, entryid)):
+            _LOGGER.info("Zendure async_migrate complete: no devices to migrate")
+            return
+
         for device in devices:
             if not any(ident[0] == DOMAIN for ident in device.identifiers):
                 continue
@@ -100,7 +163,6 @@ class Migration:
                         device_registry.async_update_device(device.id, new_identifiers=new_identifiers)
 
                 # Get the best possible name for the device: prefer name_by_user, then name, then try to infer from entities
-                entities = er.async_entries_for_device(entity_registry, device.id, True)
                 if not (name := device.name_by_user or device.name) or "_" in name:
                     continue
 
@@ -111,43 +173,51 @@ class Migration:
                     _LOGGER.info("Promoting device name '%s' -> '%s'", device.name, name)
                     device_registry.async_update_device(device.id, name=name, name_by_user=None)
 
-                for entity in entities:
+                # both parts are snakecased already, so they can be joined without another snakecase pass
+                prefix = snakecase(name.lower())
+
+                # collect the registry changes for this device, apply them afterwards in one pass
+                removals: set[str] = set()
+                conflicts: set[str] = set()
+                updates: list[tuple[str, str, str, str]] = []
+                for entity in entity_registry.entities.get_entries_for_device_id(device.id, True):
                     try:
                         # rename only entities which belong to the zendure_ha domain
                         if entity.platform == DOMAIN:
                             if entity.translation_key is None:
-                                entity_registry.async_remove(entity.entity_id)
+                                removals.add(entity.entity_id)
                                 _LOGGER.debug("Removed orphan entity %s", entity.entity_id)
                                 continue
 
-                            uniqueid = snakecase(v) if (v := Migration.repairs.get(entity.translation_key)) is not None else snakecase(entity.translation_key)
-                            if uniqueid == "":
-                                entity_registry.async_remove(entity.entity_id)
+                            if (uniqueid := Migration.translation_key(entity.translation_key)) == "":
+                                removals.add(entity.entity_id)
                                 continue
 
-                            if uniqueid.startswith("aggr") and uniqueid.endswith("total"):
-                                uniqueid = uniqueid.replace("_total", "")
-                            unique_id = snakecase(f"{name.lower()}_{uniqueid}")
+                            unique_id = f"{prefix}_{uniqueid}" if prefix else uniqueid
                             entityid = f"{entity.domain}.{unique_id}"
 
                             if entity.entity_id != entityid or entity.unique_id != unique_id or entity.translation_key != uniqueid:
                                 if entity.entity_id != entityid:
-                                    entity_registry.async_remove(entityid)
-                                if (rstate := data.last_states.pop(entity.entity_id, None)) is not None:
-                                    data.last_states[entityid] = rstate
-                                entity_registry.async_update_entity(
-                                    entity.entity_id,
-                                    new_unique_id=unique_id,
-                                    new_entity_id=entityid,
-                                    translation_key=uniqueid,
-                                )
-                                _LOGGER.debug("Migrated entity %s -> %s", entity.entity_id, entityid)
-                                changes.append((entity.entity_id, entityid))
+                                    conflicts.add(entityid)
+                                updates.append((entity.entity_id, entityid, unique_id, uniqueid))
                     except Exception as e:
                         _LOGGER.error("Failed to migrate entity %s: %s", entity.entity_id, e)
+
+                # a rename target only has to be removed if its current entity is not renamed away itself
+                conflicts.difference_update(entity_id for entity_id, _, _, _ in updates)
+                for entity_id in removals | conflicts:
+                    if entity_registry.async_get(entity_id) is not None:
+                        entity_registry.async_remove(entity_id)
+
+                # rename entities whose target is free first, until all renames are done
+                Migration._rename_entities(entity_registry, data, [u for u in updates if u[0] not in removals], changes)
             except Exception as e:
                 _LOGGER.error("Failed to migrate entity %s: %s", entity.entity_id, e)
 
+        if not changes:
+            _LOGGER.info("Zendure async_migrate complete: no entity changes")
+            return
+
         # update template config entries
         modified = 0
         for entry in hass.config_entries.async_entries():
@@ -156,25 +226,10 @@ class Migration:
             if len(new_data) == 0 and len(new_options) == 0:
                 continue
 
-            def change_id(data: dict, oid: str, nid: str) -> bool:
-                changed = False
-                for key, value in data.items():
-                    if isinstance(value, dict):
-                        changed |= change_id(value, oid, nid)
-                    elif isinstance(value, list):
-                        for i, item in enumerate(value):
-                            if isinstance(item, str) and oid in item:
-                                value[i] = item.replace(oid, nid)
-                                changed = True
-                    elif isinstance(value, str) and oid in value:
-                        data[key] = value.replace(oid, nid)
-                        changed = True
-                return changed
-
             changed = False
             for oid, nid in changes:
-                changed |= change_id(new_data, oid, nid)
-                changed |= change_id(new_options, oid, nid)
+                changed |= Migration._change_id(new_data, oid, nid)
+                changed |= Migration._change_id(new_options, oid, nid)
 
             if changed:
                 hass.config_entries.async_update_entry(entry, data=new_data, options=new_options)
@@ -182,7 +237,7 @@ class Migration:
                 modified += 1
         _LOGGER.info("Modified %d template entities", modified)
 
-        if changes and await hass.async_add_executor_job(Migration._update_files, hass, changes):
+        if await hass.async_add_executor_job(Migration._update_files, hass, changes):
             await rs.RestoreStateData.async_save_persistent_states(hass)
             async_create(
                 hass,
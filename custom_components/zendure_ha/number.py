@@ -66,7 +66,7 @@ class ZendureNumber(EntityZendure, NumberEntity):
 
             self._attr_native_value = new_value
             if self.hass and self.hass.loop.is_running():
-                self.schedule_update_ha_state()
+                self.hass.loop.call_soon(self.async_write_ha_state)
         except Exception as err:
             _LOGGER.error("Error %s setting state: %s => %s", err, self._attr_unique_id, value)
 
@@ -77,7 +77,7 @@ class ZendureNumber(EntityZendure, NumberEntity):
         if self.doupdate:
             self._attr_native_value = value
             if self.hass and self.hass.loop.is_running():
-                self.schedule_update_ha_state()
+                self.hass.loop.call_soon(self.async_write_ha_state)
 
         if self._onwrite is not None:
             if asyncio.iscoroutinefunction(self._onwrite):
@@ -89,7 +89,7 @@ class ZendureNumber(EntityZendure, NumberEntity):
         self._attr_native_min_value = minimum
         self._attr_native_max_value = maximum
         if self.hass and self.hass.loop.is_running():
-            self.schedule_update_ha_state()
+            self.hass.loop.call_soon(self.async_write_ha_state)
 
     @property
     def asNumber(self) -> int | float:
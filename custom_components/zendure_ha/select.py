@@ -31,6 +31,7 @@ class ZendureSelect(EntityZendure, SelectEntity):
         super().__init__(device, uniqueid, "select")
         self.entity_description = SelectEntityDescription(key=uniqueid, name=uniqueid)
         self._options = options
+        self._keys = {value: key for key, value in reversed(options.items())}
         self._attr_options = list(options.values())
         if current:
             self._attr_current_option = options[current]
@@ -41,7 +42,10 @@ class ZendureSelect(EntityZendure, SelectEntity):
 
     def setDict(self, options: dict[Any, str]) -> None:
         """Set the options for the select entity."""
+        if options == self._options and self._attr_current_option in self._keys:
+            return
         self._options = options
+        self._keys = {value: key for key, value in reversed(options.items())}
         self._attr_options = list(options.values())
         if self._attr_current_option not in self._attr_options:
             self._attr_current_option = self._attr_options[0]
@@ -51,6 +55,7 @@ class ZendureSelect(EntityZendure, SelectEntity):
     def setList(self, options: list[str]) -> None:
         """Set the options for the select entity."""
         self._options = None
+        self._keys = {}
         self._attr_options = options
         if self._attr_current_option not in self._attr_options:
             self._attr_current_option = self._attr_options[0]
@@ -67,7 +72,7 @@ class ZendureSelect(EntityZendure, SelectEntity):
                 if new_value != self._attr_current_option:
                     self._attr_current_option = new_value
                     if self.hass and self.hass.loop.is_running():
-                        self.schedule_update_ha_state()
+                        self.hass.loop.call_soon(self.async_write_ha_state)
 
         except Exception as err:
             _LOGGER.error("Error %s setting state: %s => %s", err, self._attr_unique_id, value)
@@ -86,11 +91,8 @@ class ZendureSelect(EntityZendure, SelectEntity):
 
     @property
     def value(self) -> Any:
-        if self._options is not None:
-            for key, value in self._options.items():
-                if value == self._attr_current_option:
-                    return key
-        return None
+        # reverse lookup of the current option, kept in sync with the options
+        return self._keys.get(self._attr_current_option)
 
 
 class ZendureRestoreSelect(ZendureSelect, RestoreEntity):
@@ -1,7 +1,6 @@
 """Interfaces with the Zendure Integration api sensors."""
 
 import logging
-import traceback
 from collections.abc import Callable
 from datetime import datetime
 from typing import Any
@@ -64,13 +63,12 @@ class ZendureSensor(EntityZendure, SensorEntity):
             if self.hass and new_value != self._attr_native_value:
                 self._attr_native_value = new_value
                 if self.hass and self.hass.loop.is_running():
-                    self.schedule_update_ha_state()
+                    self.hass.loop.call_soon(self.async_write_ha_state)
                 return True
 
-        except Exception as err:
+        except Exception:
             self._attr_native_value = value
-            _LOGGER.error("Error %s setting state: %s => %s", err, self._attr_unique_id, value)
-            _LOGGER.error(traceback.format_exc())
+            _LOGGER.exception("Error setting state: %s => %s", self._attr_unique_id, value)
         return False
 
     @property
@@ -104,7 +102,7 @@ class ZendureRestoreSensor(ZendureSensor, RestoreEntity):
         """Initialize a select entity."""
         super().__init__(device, uniqueid, template, uom, deviceclass, stateclass, precision)
         self.last_value = 0
-        self.lastValueUpdate = dt_util.utcnow()
+        self.lastValueUpdate = dt_util.utcnow().timestamp()
 
     async def async_added_to_hass(self) -> None:
         """Handle entity which will be added."""
@@ -122,12 +120,13 @@ class ZendureRestoreSensor(ZendureSensor, RestoreEntity):
     def aggregate(self, time: datetime, value: Any) -> None:
         # Get the kWh value from the last value and the time since the last update
         value = float(value) if isinstance(value, (int, float)) else 0.0
-        if (self.last_reset is None or self.last_reset.date() != time.date()) and self.state_class != "total_increasing":
+        timestamp = time.timestamp()
+        if self.state_class != "total_increasing" and (self.last_reset is None or self.last_reset.date() != time.date()):
             self._attr_native_value = 0.0
             self._attr_last_reset = time
         else:
             try:
-                kWh = self.last_value * (time.timestamp() - self.lastValueUpdate.timestamp()) / 3600000
+                kWh = self.last_value * (timestamp - self.lastValueUpdate) / 3600000
                 self._attr_native_value = kWh + (float(self._attr_native_value) if isinstance(self._attr_native_value, (int, float)) else 0.0)
             except Exception as e:
                 if not isinstance(self.state, (int, float)):
@@ -136,9 +135,9 @@ class ZendureRestoreSensor(ZendureSensor, RestoreEntity):
                 _LOGGER.error("Unable to update aggregation %s!", e)
 
         self.last_value = value
-        self.lastValueUpdate = time
+        self.lastValueUpdate = timestamp
         if self.hass and self.hass.loop.is_running():
-            self.schedule_update_ha_state()
+            self.hass.loop.call_soon(self.async_write_ha_state)
 
 
 class ZendureCalcSensor(ZendureSensor):
@@ -165,13 +164,12 @@ class ZendureCalcSensor(ZendureSensor):
             if self.hass and new_value != self._attr_native_value and self.calculate is not None:
                 self._attr_native_value = self.calculate(new_value)
                 if self.hass and self.hass.loop.is_running():
-                    self.schedule_update_ha_state()
+                    self.hass.loop.call_soon(self.async_write_ha_state)
                 return True
 
-        except Exception as err:
+        except Exception:
             self._attr_native_value = value
-            _LOGGER.error("Error %s setting state: %s => %s", err, self._attr_unique_id, value)
-            _LOGGER.error(traceback.format_exc())
+            _LOGGER.exception("Error setting state: %s => %s", self._attr_unique_id, value)
         return False
 
     def calculate_version(self, value: Any) -> Any: